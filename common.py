@@ -0,0 +1,92 @@
+import json
+import subprocess
+import os
+import sys
+import time
+import hashlib
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+def parse_json(data):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Files only read back by programs are written compactly; NF_PRETTY_JSON=1
+# indents them as well, e.g. for debugging
+PRETTY_JSON = os.environ.get('NF_PRETTY_JSON') == '1'
+
+def dump_json(data, indent=True):
+    """Serialize data to JSON bytes, compact unless indent is set, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def read_json(path, convert=None):
+    """Parse a JSON file, optionally converting the result, and reuse it while the file is unchanged."""
+    # Keyed by modification time so an unchanged file is parsed (and converted) only once
+    return read_json_file(path, os.stat(path).st_mtime_ns, convert)
+
+@lru_cache(maxsize=8)
+def read_json_file(path, mtime_ns, convert):
+    """Parse and convert a JSON file; mtime_ns only serves as part of the cache key."""
+    with open(path, 'rb') as f:
+        data = parse_json(f.read())
+    return convert(data) if convert is not None else data
+
+def atomic_write(path, data):
+    """Write bytes to a file through a temporary file, so an interrupted write never leaves it truncated."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# kubectl output is cached on disk so repeated runs within a few minutes do
+# not go back to the API server.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'nodefailure')
+KUBECTL_CACHE_TTL = 300  # seconds
+
+def stream_kubectl(args):
+    """Run a kubectl command and yield its output line by line as it is written, exiting on failure."""
+    # kubectl always writes UTF-8; decoding it as such rather than with the
+    # locale's codec keeps CPython on its fast ASCII path
+    with subprocess.Popen(['kubectl'] + args, stdout=subprocess.PIPE, encoding='utf-8', bufsize=1 << 20) as proc:
+        yield from proc.stdout
+    if proc.returncode != 0:
+        print(f"Error running kubectl {' '.join(args)}: exited with status {proc.returncode}")
+        sys.exit(1)
+
+def kubeconfig_mtime():
+    """Return the latest modification time of the active kubeconfig file(s)."""
+    kubeconfig = os.environ.get('KUBECONFIG') or os.path.join(os.path.expanduser('~'), '.kube', 'config')
+    paths = [path for path in kubeconfig.split(os.pathsep) if os.path.exists(path)]
+    return max((os.path.getmtime(path) for path in paths), default=0)
+
+def cached_kubectl(args, refresh=False):
+    """Yield kubectl output lines from the on-disk cache, refreshing it from the cluster when stale."""
+    # Keyed on the query and the kubeconfig in use; a kubeconfig change
+    # (e.g. switching context) invalidates the cached output as well
+    key = '\0'.join([os.environ.get('KUBECONFIG', '')] + args)
+    cache_file = os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.txt')
+    if not refresh and os.path.exists(cache_file):
+        cache_mtime = os.path.getmtime(cache_file)
+        if time.time() - cache_mtime < KUBECTL_CACHE_TTL and cache_mtime >= kubeconfig_mtime():
+            with open(cache_file, encoding='utf-8') as f:
+                yield from f
+            return
+
+    # Only a complete listing is cached, so a fetch that fails or is cut
+    # short never leaves a partial entry behind
+    lines = []
+    for line in stream_kubectl(args):
+        lines.append(line)
+        yield line
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    atomic_write(cache_file, ''.join(lines).encode('utf-8'))
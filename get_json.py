@@ -1,29 +1,29 @@
-import json
-import subprocess
 import os
-import sys
-
-def get_all_pods():
-    """Retrieve all pods in the Kubernetes cluster."""
-    cmd = ['kubectl', 'get', 'pods', '--all-namespaces', '-o', 'json']
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("Error retrieving pods:", result.stderr)
-        sys.exit(1)
-    pods_data = json.loads(result.stdout)
-    return pods_data
-
-def extract_all_containers(pods_data):
-    """Extract all container names and their namespaces from the pods data."""
-    containers = {}
-    for pod in pods_data['items']:
-        namespace = pod['metadata']['namespace']
-        for container in pod['spec']['containers']:
-            container_name = container['name']
-            if namespace not in containers:
-                containers[namespace] = set()
-            containers[namespace].add(container_name)
-    return containers
+import argparse
+from collections import defaultdict
+
+from common import parse_json, dump_json, atomic_write, cached_kubectl
+
+# One "<namespace>\t<container> <container> ..." line per pod
+POD_CONTAINERS_JSONPATH = (
+    '{range .items[*]}{.metadata.namespace}{"\\t"}'
+    '{range .spec.containers[*]}{.name}{" "}{end}{"\\n"}{end}'
+)
+
+def get_all_pods(refresh=False):
+    """Stream the namespace and container names of all pods in the Kubernetes cluster, one line per pod."""
+    # The output is cached on disk for a few minutes
+    cmd = ['get', 'pods', '--all-namespaces', '-o', f'jsonpath={POD_CONTAINERS_JSONPATH}']
+    return cached_kubectl(cmd, refresh)
+
+def extract_all_containers(pod_lines):
+    """Extract all container names and their namespaces from the kubectl pod lines."""
+    containers = defaultdict(set)
+    for line in pod_lines:
+        namespace, _, container_names = line.partition('\t')
+        if container_names:
+            containers[namespace].update(container_names.split())
+    return dict(containers)
 
 def generate_container_info_template(containers):
     """Generate a template JSON for container information with namespaces."""
@@ -40,20 +40,26 @@ def generate_container_info_template(containers):
 
 def save_template_to_file(template, filename='container_info.json'):
     """Save the container info template to a JSON file."""
-    with open(filename, 'w') as f:
-        json.dump(template, f, indent=2)
+    atomic_write(filename, dump_json(template))
     print(f"File saved as {filename}.")
 
-def calculate_namespace_completion(container_info):
-    """Calculate the completion percentage for each namespace based on filled descriptions."""
-    namespace_completion = {}
+def is_description_filled(container):
+    """Check whether a container has a description other than the template placeholder."""
+    description = container.get('description', '')
+    return bool(description) and description.strip() != 'Enter description here'
+
+def count_filled_descriptions(container_info):
+    """Count filled descriptions per namespace as [filled, total] pairs."""
+    description_counts = {}
     for namespace, containers in container_info.items():
-        total_containers = len(containers)
-        filled_containers = 0
-        for container in containers.values():
-            description = container.get('description', '')
-            if description and description.strip() != 'Enter description here':
-                filled_containers += 1
+        filled_containers = sum(1 for container in containers.values() if is_description_filled(container))
+        description_counts[namespace] = [filled_containers, len(containers)]
+    return description_counts
+
+def calculate_namespace_completion(description_counts):
+    """Calculate the completion percentage for each namespace from its description counts."""
+    namespace_completion = {}
+    for namespace, (filled_containers, total_containers) in description_counts.items():
         completion_percentage = int((filled_containers / total_containers) * 100) if total_containers > 0 else 0
         namespace_completion[namespace] = completion_percentage
     return namespace_completion
@@ -85,22 +91,28 @@ def calculate_container_completion(container_info, namespace):
         container_completion[container_name] = completion_percentage
     return container_completion
 
-def edit_container_info(container_info):
-    """Allow the user to edit the container info."""
+def edit_container_info(container_info, edited):
+    """Allow the user to edit the container info, adding each edited (namespace, container) to edited."""
+    # Edits are only kept in memory here; the caller saves them once on exit
+    # Count filled descriptions once and keep the counts up to date on edits,
+    # so redrawing the menu does not rescan every container
+    description_counts = count_filled_descriptions(container_info)
+    namespaces = list(container_info.keys())
+
+    # Determine the maximum length of the namespace names for alignment
+    max_ns_length = max(len(ns) for ns in namespaces) if namespaces else 0
+
     while True:
         # Calculate completion percentage for each namespace
-        namespace_completion = calculate_namespace_completion(container_info)
-        namespaces = list(container_info.keys())
-
-        # Determine the maximum length of the namespace names for alignment
-        max_ns_length = max(len(ns) for ns in namespaces) if namespaces else 0
+        namespace_completion = calculate_namespace_completion(description_counts)
 
-        print("\nNamespaces:")
+        menu_lines = ["\nNamespaces:"]
         for idx, ns in enumerate(namespaces, 1):
             completion = namespace_completion.get(ns, 0)
             # Adjust the formatting to align percentages
-            print(f"{idx}. {ns:<{max_ns_length}}    ({completion:>3}%) completed")
-        print(f"{len(namespaces)+1}. Go back to main menu")
+            menu_lines.append(f"{idx}. {ns:<{max_ns_length}}    ({completion:>3}%) completed")
+        menu_lines.append(f"{len(namespaces)+1}. Go back to main menu")
+        print('\n'.join(menu_lines))
 
         ns_choice = input("Select a namespace to edit (or enter number to go back): ")
         if not ns_choice.isdigit() or not (1 <= int(ns_choice) <= len(namespaces)+1):
@@ -112,19 +124,20 @@ def edit_container_info(container_info):
 
         selected_ns = namespaces[ns_choice - 1]
         containers = list(container_info[selected_ns].keys())
+        # Determine the maximum length of the container names for alignment
+        max_cont_length = max(len(cont) for cont in containers) if containers else 0
 
         while True:
             # Calculate completion percentage for containers in the selected namespace
             container_completion = calculate_container_completion(container_info, selected_ns)
-            # Determine the maximum length of the container names for alignment
-            max_cont_length = max(len(cont) for cont in containers) if containers else 0
 
-            print(f"\nContainers in namespace '{selected_ns}':")
+            menu_lines = [f"\nContainers in namespace '{selected_ns}':"]
             for idx, container in enumerate(containers, 1):
                 completion = container_completion.get(container, 0)
                 # Adjust the formatting to align percentages
-                print(f"{idx}. {container:<{max_cont_length}}    ({completion:>3}%) completed")
-            print(f"{len(containers)+1}. Go back to namespace selection")
+                menu_lines.append(f"{idx}. {container:<{max_cont_length}}    ({completion:>3}%) completed")
+            menu_lines.append(f"{len(containers)+1}. Go back to namespace selection")
+            print('\n'.join(menu_lines))
 
             cont_choice = input("Select a container to edit (or enter number to go back): ")
             if not cont_choice.isdigit() or not (1 <= int(cont_choice) <= len(containers)+1):
@@ -135,7 +148,10 @@ def edit_container_info(container_info):
                 break  # Go back to namespace selection
 
             selected_cont = containers[cont_choice - 1]
-            cont_info = container_info[selected_ns][selected_cont]
+            # Edit a copy and store it only once every prompt is answered, so
+            # an interrupted edit leaves the entry as it was
+            old_info = container_info[selected_ns][selected_cont]
+            cont_info = dict(old_info)
 
             # Edit description
             print(f"\nCurrent description: {cont_info['description']}")
@@ -159,9 +175,9 @@ def edit_container_info(container_info):
                 # Get list of namespaces to choose dependencies from
                 dep_namespaces = list(container_info.keys())
                 dep_namespaces.append('None')
-                print("\nAvailable namespaces for dependencies:")
-                for idx, ns in enumerate(dep_namespaces, 1):
-                    print(f"{idx}. {ns}")
+                menu_lines = ["\nAvailable namespaces for dependencies:"]
+                menu_lines.extend(f"{idx}. {ns}" for idx, ns in enumerate(dep_namespaces, 1))
+                print('\n'.join(menu_lines))
                 dep_ns_choice = input("Select a namespace for dependencies (or 'None' for no dependencies): ")
                 if dep_ns_choice.isdigit() and 1 <= int(dep_ns_choice) <= len(dep_namespaces):
                     dep_ns_choice = int(dep_ns_choice)
@@ -170,10 +186,10 @@ def edit_container_info(container_info):
                         cont_info['dependencies'] = []
                     else:
                         dep_containers = list(container_info[dep_ns_selected].keys())
-                        print(f"\nContainers in namespace '{dep_ns_selected}':")
-                        for idx, dep_cont in enumerate(dep_containers, 1):
-                            print(f"{idx}. {dep_cont}")
-                        print(f"{len(dep_containers)+1}. Cancel dependency selection")
+                        menu_lines = [f"\nContainers in namespace '{dep_ns_selected}':"]
+                        menu_lines.extend(f"{idx}. {dep_cont}" for idx, dep_cont in enumerate(dep_containers, 1))
+                        menu_lines.append(f"{len(dep_containers)+1}. Cancel dependency selection")
+                        print('\n'.join(menu_lines))
 
                         dep_cont_choice = input("Select a container to depend on (enter numbers separated by commas): ")
                         if dep_cont_choice.strip():
@@ -190,45 +206,71 @@ def edit_container_info(container_info):
                 else:
                     print("Invalid choice. Skipping dependency update.")
 
+            container_info[selected_ns][selected_cont] = cont_info
+            description_counts[selected_ns][0] += is_description_filled(cont_info) - is_description_filled(old_info)
+            edited.add((selected_ns, selected_cont))
             print("\nContainer information updated successfully.")
-            # Save after each edit
-            save_template_to_file(container_info)
 
     print("\nReturning to container list...")
 
-def main_menu():
+MAIN_MENU = """
+Main Menu:
+1. Generate a new container info template file
+2. Edit the existing container info file
+3. Save and exit"""
+
+def main_menu(refresh=False):
     """Display the main menu and handle user choices."""
     # Load existing container_info.json if it exists
     if os.path.exists('container_info.json'):
-        with open('container_info.json') as f:
-            container_info = json.load(f)
+        with open('container_info.json', 'rb') as f:
+            container_info = parse_json(f.read())
     else:
         container_info = {}
+    # Whether container_info has changes that are not on disk yet: a file that
+    # does not exist yet, or containers whose edit has been completed
+    dirty = not os.path.exists('container_info.json')
+    edited = set()
 
-    while True:
-        print("\nMain Menu:")
-        print("1. Generate a new container info template file")
-        print("2. Edit the existing container info file")
-        print("3. Save and exit")
-        choice = input("Enter your choice (1/2/3): ")
-
-        if choice == '1':
-            pods_data = get_all_pods()
-            containers = extract_all_containers(pods_data)
-            container_info = generate_container_info_template(containers)
-            save_template_to_file(container_info)
-            print("New container info template generated.")
-        elif choice == '2':
-            if not container_info:
-                print("No container info file found. Please generate a new template first.")
+    try:
+        while True:
+            print(MAIN_MENU)
+            choice = input("Enter your choice (1/2/3): ")
+
+            if choice == '1':
+                containers = extract_all_containers(get_all_pods(refresh))
+                container_info = generate_container_info_template(containers)
+                save_template_to_file(container_info)
+                dirty = False
+                edited.clear()
+                print("New container info template generated.")
+            elif choice == '2':
+                if not container_info:
+                    print("No container info file found. Please generate a new template first.")
+                else:
+                    edit_container_info(container_info, edited)
+            elif choice == '3':
+                if dirty or edited:
+                    save_template_to_file(container_info)
+                    dirty = False
+                    edited.clear()
+                    print("Exiting. Changes saved.")
+                else:
+                    print("Exiting. No changes to save.")
+                break
             else:
-                edit_container_info(container_info)
-        elif choice == '3':
+                print("Invalid choice. Please try again.")
+    except (KeyboardInterrupt, EOFError):
+        print("\nExiting.")
+    finally:
+        # Whatever ends the session (Ctrl-C, end of input or an error), write
+        # out completed edits that have not been saved yet
+        if (dirty or edited) and container_info:
             save_template_to_file(container_info)
-            print("Exiting. Changes saved.")
-            break
-        else:
-            print("Invalid choice. Please try again.")
 
 if __name__ == '__main__':
-    main_menu()
+    parser = argparse.ArgumentParser(description="Generate and edit the container info file.")
+    parser.add_argument('--refresh', '--no-cache', action='store_true',
+                        help="ignore the cached pod list and query the cluster again")
+    args = parser.parse_args()
+    main_menu(refresh=args.refresh)
@@ -1,37 +1,126 @@
-import json
-import subprocess
+import io
 import os
+import sys
+import time
+import argparse
+import threading
+from collections import namedtuple, defaultdict
+from operator import attrgetter
 from datetime import datetime
 
-def save_session_data():
-    """Retrieve node and pod information and save it to session.json."""
-    # Retrieve nodes
-    cmd_nodes = ['kubectl', 'get', 'nodes', '-o', 'json']
-    result_nodes = subprocess.run(cmd_nodes, capture_output=True, text=True)
-    nodes_data = json.loads(result_nodes.stdout)
-
-    # Retrieve pods
-    cmd_pods = ['kubectl', 'get', 'pods', '--all-namespaces', '-o', 'json']
-    result_pods = subprocess.run(cmd_pods, capture_output=True, text=True)
-    pods_data = json.loads(result_pods.stdout)
-
-    # Save to session.json
+from common import PRETTY_JSON, dump_json, read_json, atomic_write, stream_kubectl
+
+# Impact description and sort order (most critical first) for each criticality level
+CRITICALITY_IMPACT = {
+    'high': ('High impact', 1),
+    'medium': ('Moderate impact', 2),
+    'low': ('Low impact', 3),
+}
+UNKNOWN_IMPACT = ('Unknown impact', 4)
+# Reports only store the sort order; the impact text is looked up when rendered
+IMPACT_BY_SORT = {sort: impact for impact, sort in (*CRITICALITY_IMPACT.values(), UNKNOWN_IMPACT)}
+
+# One row of the impact assessment. A namedtuple keeps per-container memory
+# well below that of a dict and gives fixed attribute access.
+Report = namedtuple('Report', [
+    'namespace', 'pod_name', 'container_name', 'full_name', 'node_name', 'description',
+    'dependencies', 'dependencies_text', 'criticality', 'criticality_label', 'criticality_sort'
+])
+
+# C-level sort key, avoiding a Python lambda call per report
+CRITICALITY_SORT_KEY = attrgetter('criticality_sort')
+
+# Shared placeholder for containers missing from container_info.json
+MISSING_CONTAINER_INFO = {
+    'description': 'No information available',
+    'dependencies': (),
+    'criticality': 'unknown'
+}
+
+# One "<namespace>\t<pod>\t<node>\t<container> <container> ..." line per pod
+POD_FIELDS_JSONPATH = (
+    '{range .items[*]}{.metadata.namespace}{"\\t"}{.metadata.name}{"\\t"}{.spec.nodeName}{"\\t"}'
+    '{range .spec.containers[*]}{.name}{" "}{end}{"\\n"}{end}'
+)
+
+def get_cluster_nodes():
+    """Retrieve node information from the cluster."""
+    # Only node names are used, so have kubectl print just those rather than
+    # send full Node objects, whose status and image lists make them large
+    output = ''.join(stream_kubectl(['get', 'nodes', '-o', 'jsonpath={.items[*].metadata.name}']))
+    # Keep the NodeList layout so session.json and get_node_list are unchanged
+    return {'items': [{'metadata': {'name': name}} for name in output.split()]}
+
+def get_cluster_pods():
+    """Retrieve pod information for all namespaces from the cluster."""
+    # Build each pod from its line, keeping the PodList layout but only
+    # the fields the reports use
+    pods = []
+    cmd = ['get', 'pods', '--all-namespaces', '-o', f'jsonpath={POD_FIELDS_JSONPATH}']
+    for line in stream_kubectl(cmd):
+        namespace, pod_name, node_name, container_names = line.rstrip('\n').split('\t')
+        spec = {'containers': [{'name': name} for name in container_names.split()]}
+        if node_name:
+            spec['nodeName'] = node_name
+        pods.append({'metadata': {'namespace': namespace, 'name': pod_name}, 'spec': spec})
+    return {'items': pods}
+
+# session.json is reused until it is deleted, so a snapshot can be analysed
+# offline; NF_SESSION_TTL (seconds) makes older snapshots be collected again
+def session_ttl():
+    """Return the maximum age of session.json in seconds from NF_SESSION_TTL, 0 meaning no limit."""
+    value = os.environ.get('NF_SESSION_TTL', '').strip() or '0'
+    try:
+        ttl = int(value)
+    except ValueError:
+        ttl = -1
+    if ttl < 0:
+        print(f"Invalid NF_SESSION_TTL '{value}': expected a whole number of seconds.")
+        sys.exit(1)
+    return ttl
+
+def session_age():
+    """Return how many seconds ago session.json was written, or None if it does not exist."""
+    if not os.path.exists('session.json'):
+        return None
+    return time.time() - os.path.getmtime('session.json')
+
+def run_in_background(func, *args):
+    """Start func(*args) on a daemon thread and return a function that waits for its result."""
+    # A daemon thread never holds up interpreter exit, so returning early,
+    # exiting on an error or Ctrl-C does not wait for the call to finish
+    outcome = {}
+    def target():
+        try:
+            outcome['result'] = func(*args)
+        except BaseException as error:  # re-raised by the caller, including sys.exit()
+            outcome['error'] = error
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+
+    def result():
+        thread.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+    return result
+
+def save_session_data(nodes_data, pods_data):
+    """Save node and pod information to session.json and return it as session data."""
     session_data = {
         'nodes': nodes_data,
         'pods': pods_data
     }
-    with open('session.json', 'w') as f:
-        json.dump(session_data, f, indent=4)
+    atomic_write('session.json', dump_json(session_data, indent=PRETTY_JSON))
     print("Session data saved to 'session.json'.")
+    return session_data
 
 def load_session_data():
     """Load node and pod information from session.json."""
     if not os.path.exists('session.json'):
         print("session.json not found. Please run the script to generate session data.")
         return None
-    with open('session.json', 'r') as f:
-        session_data = json.load(f)
-    return session_data
+    return read_json('session.json')
 
 def get_node_list(session_data):
     """Retrieve the list of node names from the session data."""
@@ -41,10 +130,10 @@ def get_node_list(session_data):
 
 def select_node(node_names):
     """Prompt the user to select a node from the list, or choose to generate a combined report."""
-    print("Available Nodes:")
-    for idx, name in enumerate(node_names, start=1):
-        print(f"{idx}. {name}")
-    print(f"{len(node_names) + 1}. Generate combined report for all nodes")
+    menu_lines = ["Available Nodes:"]
+    menu_lines.extend(f"{idx}. {name}" for idx, name in enumerate(node_names, start=1))
+    menu_lines.append(f"{len(node_names) + 1}. Generate combined report for all nodes")
+    print('\n'.join(menu_lines))
     while True:
         try:
             choice = int(input("Select a node by entering the corresponding number: "))
@@ -73,80 +162,134 @@ def get_pods_all_nodes(session_data):
     return session_data['pods']
 
 def extract_containers(pods_data):
-    """Extract container names and namespaces from pods data."""
-    containers = []
+    """Yield (namespace, pod_name, container_name, node_name) for every container in the pods data."""
     for pod in pods_data['items']:
-        namespace = pod['metadata']['namespace']
+        # Namespace, node and container names repeat across many pods; intern
+        # them so every report shares one string object per distinct name
+        namespace = sys.intern(pod['metadata']['namespace'])
         pod_name = pod['metadata']['name']
-        node_name = pod['spec'].get('nodeName', 'Unknown')
+        node_name = sys.intern(pod['spec'].get('nodeName', 'Unknown'))
         for container in pod['spec']['containers']:
-            containers.append({
-                'namespace': namespace,
-                'pod_name': pod_name,
-                'container_name': container['name'],
-                'node_name': node_name
-            })
-    return containers
+            yield namespace, pod_name, sys.intern(container['name']), node_name
 
 def load_container_info():
-    """Load predefined container information from a JSON file."""
+    """Load predefined container information from a JSON file, keyed by (namespace, container name)."""
     if not os.path.exists('container_info.json'):
         print("container_info.json not found. Please provide the container information.")
         return None
-    with open('container_info.json') as f:
-        return json.load(f)
+    return read_json('container_info.json', flatten_container_info)
+
+def flatten_container_info(container_info):
+    """Flatten the namespace -> container -> info mapping into a (namespace, container) -> info mapping."""
+    # Keys are interned like the names extract_containers yields, so lookups
+    # compare by identity instead of by content
+    return {
+        (sys.intern(namespace), sys.intern(container_name)): info
+        for namespace, containers in container_info.items()
+        for container_name, info in containers.items()
+    }
+
+def resolve_container_fields(info):
+    """Validate a container_info entry and derive the report fields shared by every replica."""
+    criticality = info.get('criticality', 'unknown')
+    if not isinstance(criticality, str):
+        criticality = 'unknown'
+    criticality = sys.intern(criticality)
+    criticality_sort = CRITICALITY_IMPACT.get(criticality, UNKNOWN_IMPACT)[1]
+    dependencies = info.get('dependencies') or ()
+    if not isinstance(dependencies, (list, tuple)):
+        dependencies = [dependencies]
+    # Same order as the corresponding Report fields
+    return (
+        info.get('description', 'No information available'),
+        dependencies,
+        # Joined once here so every report and table can reuse it
+        ', '.join(dependencies) if dependencies else 'None',
+        criticality,
+        # Capitalized once here for the tables
+        criticality.capitalize(),
+        criticality_sort
+    )
+
+MISSING_CONTAINER_FIELDS = resolve_container_fields(MISSING_CONTAINER_INFO)
 
 def assess_impact(containers, container_info):
-    """Assess the impact based on container criticality and dependencies."""
+    """Assess the impact of extracted containers using the flat (namespace, container) info mapping."""
+    # container_info entries are validated and resolved the first time a
+    # container refers to them, so a report over a few pods does not pay for
+    # the whole file, and pod replicas reuse the resolved fields and full name
+    resolved_fields = {}
     reports = []
     missing_containers = []
-    for container in containers:
-        namespace = container['namespace']
-        container_name = container['container_name']
-        pod_name = container['pod_name']
-        node_name = container['node_name']
-
-        info = container_info.get(namespace, {}).get(container_name)
-        if info is None:
-            missing_containers.append((namespace, container_name))
-            info = {
-                'description': 'No information available',
-                'dependencies': [],
-                'criticality': 'unknown'
-            }
-
-        criticality = info.get('criticality', 'unknown')
-        if criticality == 'high':
-            impact = 'High impact'
-            criticality_sort = 1
-        elif criticality == 'medium':
-            impact = 'Moderate impact'
-            criticality_sort = 2
-        elif criticality == 'low':
-            impact = 'Low impact'
-            criticality_sort = 3
-        else:
-            impact = 'Unknown impact'
-            criticality_sort = 4
-
-        reports.append({
-            'namespace': namespace,
-            'pod_name': pod_name,
-            'container_name': container_name,
-            'node_name': node_name,
-            'description': info.get('description', 'No information available'),
-            'dependencies': info.get('dependencies', []),
-            'criticality': criticality,
-            'criticality_sort': criticality_sort,
-            'impact': impact
-        })
+    for namespace, pod_name, container_name, node_name in containers:
+        key = (namespace, container_name)
+        resolved = resolved_fields.get(key)
+        if resolved is None:
+            info = container_info.get(key)
+            fields = resolve_container_fields(info) if info is not None else MISSING_CONTAINER_FIELDS
+            resolved = resolved_fields[key] = (f"{namespace}/{container_name}", fields)
+        full_name, fields = resolved
+        if fields is MISSING_CONTAINER_FIELDS:
+            missing_containers.append(key)
+
+        reports.append(Report(namespace, pod_name, container_name, full_name, node_name, *fields))
     return reports, missing_containers
 
+# Detailed per-container section of a single node report
+REPORT_ENTRY_TEMPLATE = (
+    "Namespace: {0.namespace}\n"
+    "Pod: {0.pod_name}\n"
+    "Container: {0.container_name}\n"
+    "Description: {0.description}\n"
+    "Dependencies: {0.dependencies_text}\n"
+    "Criticality: {0.criticality}\n"
+    "Impact: {1}\n"
+    + '-' * 80
+)
+
+class FilenameCharTable(dict):
+    """str.translate table that keeps alphanumerics, spaces, underscores and hyphens and drops the rest."""
+    def __missing__(self, codepoint):
+        # Decide each character once, the first time it is seen
+        char = chr(codepoint)
+        self[codepoint] = char if char.isalnum() or char in ' _-' else None
+        return self[codepoint]
+
+FILENAME_CHAR_TABLE = FilenameCharTable()
+
 def sanitize_filename(filename):
     """Sanitize the filename by removing or replacing invalid characters."""
-    return "".join(c for c in filename if c.isalnum() or c in (' ', '_', '-')).rstrip()
-
-def print_report(impact_reports, selected_node):
+    return filename.translate(FILENAME_CHAR_TABLE).rstrip()
+
+# Views over the impact reports that the menu actions share, built once
+ReportSummary = namedtuple('ReportSummary', [
+    'reports', 'sorted_reports', 'criticality_counts', 'reports_by_node', 'sorted_reports_by_node'
+])
+
+def summarize_reports(impact_reports):
+    """Count the reports per criticality and group them by node in one pass, and sort them once."""
+    criticality_counts = defaultdict(int)
+    reports_by_node = defaultdict(list)
+    for report in impact_reports:
+        criticality_counts[report.criticality_sort] += 1
+        reports_by_node[report.node_name].append(report)
+    sorted_reports = sorted(impact_reports, key=CRITICALITY_SORT_KEY)
+    # The sort is stable, so splitting the sorted reports by node gives each
+    # node's table rows without sorting every node's reports again
+    sorted_reports_by_node = defaultdict(list)
+    for report in sorted_reports:
+        sorted_reports_by_node[report.node_name].append(report)
+    # Nodes in name order, as every report lists them
+    nodes = sorted(reports_by_node)
+    return ReportSummary(
+        impact_reports,
+        sorted_reports,
+        criticality_counts,
+        {node: reports_by_node[node] for node in nodes},
+        {node: sorted_reports_by_node[node] for node in nodes}
+    )
+
+def print_report(summary, selected_node):
     """Print the impact report and save it to a text file with date and node name."""
     # Get current date and time for the report (exclude seconds)
     current_datetime = datetime.now().strftime("%Y%m%d_%H%M")
@@ -158,40 +301,27 @@ def print_report(impact_reports, selected_node):
         report_filename = f"combined_nodes_{current_datetime}.txt"
         report_title = "Combined Impact Assessment Report for All Nodes"
 
-    # Prepare the report content
-    report_lines = []
-    report_lines.append(report_title)
-    report_lines.append("=" * 80)
-    report_lines.append(f"Date: {current_datetime}")
-    report_lines.append("=" * 80)
+    # Prepare the report content, writing it into one buffer as it is
+    # generated rather than collecting lines and joining them afterwards
+    report_buffer = io.StringIO()
+    report_buffer.write(f"{report_title}\n{'=' * 80}\nDate: {current_datetime}\n{'=' * 80}")
 
     if selected_node:
         # Generate detailed report for individual node
-        for report in impact_reports:
-            report_lines.append(f"Namespace: {report['namespace']}")
-            report_lines.append(f"Pod: {report['pod_name']}")
-            report_lines.append(f"Container: {report['container_name']}")
-            report_lines.append(f"Description: {report['description']}")
-            report_lines.append(f"Dependencies: {', '.join(report['dependencies']) if report['dependencies'] else 'None'}")
-            report_lines.append(f"Criticality: {report['criticality']}")
-            report_lines.append(f"Impact: {report['impact']}")
-            report_lines.append('-' * 80)
+        for report in summary.reports:
+            report_buffer.write('\n')
+            report_buffer.write(REPORT_ENTRY_TEMPLATE.format(report, IMPACT_BY_SORT[report.criticality_sort]))
 
         # Include the table report in the printed report
-        table_lines = generate_table_report(impact_reports)
-        report_text = '\n'.join(report_lines + ['\n'] + table_lines)
+        report_buffer.write('\n\n\n')
+        report_buffer.write('\n'.join(generate_table_report(summary.sorted_reports)))
     else:
         # For combined report, generate tables per node
-        nodes = sorted(set(report['node_name'] for report in impact_reports))
-        for node in nodes:
-            node_reports = [report for report in impact_reports if report['node_name'] == node]
-            report_lines.append(f"\nNode: {node}")
-            report_lines.append('-' * 80)
-            table_lines = generate_table_per_node(node_reports)
-            report_lines.extend(table_lines)
-
-        report_text = '\n'.join(report_lines)
+        for node, node_reports in summary.sorted_reports_by_node.items():
+            report_buffer.write(f"\n\nNode: {node}\n{'-' * 80}\n")
+            report_buffer.write('\n'.join(generate_table_per_node(node_reports)))
 
+    report_text = report_buffer.getvalue()
     print(report_text)
 
     # Save to a text file with date and node name in the filename
@@ -199,174 +329,182 @@ def print_report(impact_reports, selected_node):
         f.write(report_text)
     print(f"\nReport saved to '{report_filename}'.")
 
-def generate_table_per_node(node_reports):
-    """Generate a table report for a specific node."""
-    # Sort the reports by criticality
-    sorted_reports = sorted(node_reports, key=lambda x: x['criticality_sort'])
-
+def generate_table_per_node(sorted_reports):
+    """Generate a table report for a specific node from its reports sorted by criticality."""
     # Determine the maximum length for alignment
-    container_names = [f"{report['namespace']}/{report['container_name']}" for report in sorted_reports]
-    max_name_length = max(len(name) for name in container_names) if container_names else 0
-
-    table_lines = []
-    table_lines.append(f"{'Container Name':<{max_name_length}}  | Criticality | Dependencies")
-    table_lines.append('-' * (max_name_length + 50))
-    for report in sorted_reports:
-        container_full_name = f"{report['namespace']}/{report['container_name']}"
-        criticality = report['criticality'].capitalize()
-        dependencies = ', '.join(report['dependencies']) if report['dependencies'] else 'None'
-        line = f"{container_full_name:<{max_name_length}}  | {criticality:^11} | {dependencies}"
-        table_lines.append(line)
+    max_name_length = max((len(report.full_name) for report in sorted_reports), default=0)
+
+    # Bake the column width into the row format once per table rather than
+    # padding each row separately
+    row_format = f"{{:<{max_name_length}}}  | {{:^11}} | {{}}"
+    table_lines = [
+        row_format.format('Container Name', 'Criticality', 'Dependencies'),
+        '-' * (max_name_length + 50)
+    ]
+    table_lines.extend(
+        row_format.format(report.full_name, report.criticality_label, report.dependencies_text)
+        for report in sorted_reports
+    )
     table_lines.append('=' * (max_name_length + 50))
     return table_lines
 
-def generate_table_report(impact_reports):
-    """Generate a table report sorted by criticality from High to Low."""
-    # Sort the reports by criticality
-    sorted_reports = sorted(impact_reports, key=lambda x: x['criticality_sort'])
+def generate_table_report(sorted_reports):
+    """Generate a table report from reports sorted by criticality from High to Low."""
+    table_lines = generate_table_per_node(sorted_reports)
+    # The table's closing rule already has the full table width
+    return ["Containers Summary:", table_lines[-1]] + table_lines
 
-    # Determine the maximum length for alignment
-    container_names = [f"{report['namespace']}/{report['container_name']}" for report in sorted_reports]
-    max_name_length = max(len(name) for name in container_names) if container_names else 0
-
-    table_lines = []
-    table_lines.append("Containers Summary:")
-    table_lines.append("=" * (max_name_length + 50))
-    table_lines.append(f"{'Container Name':<{max_name_length}}  | Criticality | Dependencies")
-    table_lines.append('-' * (max_name_length + 50))
-    for report in sorted_reports:
-        container_full_name = f"{report['namespace']}/{report['container_name']}"
-        criticality = report['criticality'].capitalize()
-        dependencies = ', '.join(report['dependencies']) if report['dependencies'] else 'None'
-        line = f"{container_full_name:<{max_name_length}}  | {criticality:^11} | {dependencies}"
-        table_lines.append(line)
-    table_lines.append('=' * (max_name_length + 50))
-    return table_lines
+STATISTICS_MENU = """
+Report Statistics Menu:
+1. Count how many critical containers are there
+2. List all containers with criticality and dependencies
+3. Go back to main menu"""
 
-def gather_statistics(impact_reports):
+def gather_statistics(summary):
     """Gather and display report statistics."""
     while True:
-        print("\nReport Statistics Menu:")
-        print("1. Count how many critical containers are there")
-        print("2. List all containers with criticality and dependencies")
-        print("3. Go back to main menu")
+        print(STATISTICS_MENU)
         choice = input("Select an option (1/2/3): ").strip()
 
         if choice == '1':
-            count_critical_containers(impact_reports)
+            count_critical_containers(summary.criticality_counts)
         elif choice == '2':
-            list_containers_with_details(impact_reports)
+            list_containers_with_details(summary.sorted_reports)
         elif choice == '3':
             break
         else:
             print("Invalid choice. Please select 1, 2, or 3.")
 
-def count_critical_containers(impact_reports):
+def count_critical_containers(criticality_counts):
     """Count and display the number of critical containers."""
-    critical_count = sum(1 for report in impact_reports if report['criticality'] == 'high')
+    critical_count = criticality_counts[CRITICALITY_IMPACT['high'][1]]
     print(f"\nTotal number of critical containers: {critical_count}")
 
-def list_containers_with_details(impact_reports):
+def list_containers_with_details(sorted_reports):
     """List all containers with their criticality and dependencies, sorted from High to Low."""
-    table_lines = generate_table_report(impact_reports)
-    for line in table_lines:
-        print(line)
+    table_lines = generate_table_report(sorted_reports)
+    # One write for the whole table rather than one print per row
+    print('\n'.join(table_lines))
+
+def report_to_dict(report):
+    """Convert a report to its consolidated JSON entry."""
+    return {
+        'namespace': report.namespace,
+        'pod_name': report.pod_name,
+        'container_name': report.container_name,
+        'node_name': report.node_name,
+        'description': report.description,
+        'dependencies': report.dependencies,
+        'criticality': report.criticality,
+        'criticality_sort': report.criticality_sort,
+        'impact': IMPACT_BY_SORT[report.criticality_sort]
+    }
 
-def generate_consolidated_json(impact_reports):
+def generate_consolidated_json(reports_by_node):
     """Generate a consolidated JSON file with the impact reports."""
     # Get current date and time for the filename (exclude seconds)
     current_datetime = datetime.now().strftime("%Y%m%d_%H%M")
     filename = f"consolidated_{current_datetime}.json"
 
     # Organize the reports by node
-    nodes = sorted(set(report['node_name'] for report in impact_reports))
-    consolidated_data = {}
-    for node in nodes:
-        node_reports = [report for report in impact_reports if report['node_name'] == node]
-        consolidated_data[node] = node_reports
+    consolidated_data = {
+        node: [report_to_dict(report) for report in node_reports]
+        for node, node_reports in reports_by_node.items()
+    }
 
     # Save to a JSON file
-    with open(filename, 'w') as f:
-        json.dump(consolidated_data, f, indent=4)
+    with open(filename, 'wb') as f:
+        f.write(dump_json(consolidated_data, indent=PRETTY_JSON))
     print(f"\nConsolidated data saved to '{filename}'.")
 
-def generate_graph_data_json(impact_reports):
+def generate_graph_data_json(reports_by_node):
     """Generate a JSON file containing graph data structured per node."""
-    # Organize the reports by node
-    nodes = sorted(set(report['node_name'] for report in impact_reports))
     graph_data = {}
-    for node in nodes:
-        node_reports = [report for report in impact_reports if report['node_name'] == node]
-        node_graph = {
-            'nodes': [],
-            'edges': []
+    for node, node_reports in reports_by_node.items():
+        # Build node list and edges, one entry per container and per dependency
+        graph_data[node] = {
+            'nodes': [
+                {
+                    'id': report.full_name,
+                    'label': report.full_name,
+                    'criticality': report.criticality,
+                    'description': report.description,
+                    'dependencies': report.dependencies
+                }
+                for report in node_reports
+            ],
+            'edges': [
+                {'from': report.full_name, 'to': dep}
+                for report in node_reports
+                for dep in report.dependencies
+            ]
         }
-        # Build node list and edges
-        for report in node_reports:
-            container_full_name = f"{report['namespace']}/{report['container_name']}"
-            node_graph['nodes'].append({
-                'id': container_full_name,
-                'label': container_full_name,
-                'criticality': report['criticality'],
-                'description': report['description'],
-                'dependencies': report['dependencies']
-            })
-            # Add edges for dependencies
-            for dep in report['dependencies']:
-                node_graph['edges'].append({
-                    'from': container_full_name,
-                    'to': dep
-                })
-        graph_data[node] = node_graph
 
     # Save to a JSON file
     filename = "graph_data.json"
-    with open(filename, 'w') as f:
-        json.dump(graph_data, f, indent=4)
+    with open(filename, 'wb') as f:
+        f.write(dump_json(graph_data, indent=PRETTY_JSON))
     print(f"\nGraph data saved to '{filename}'.")
 
-def main_menu(impact_reports, selected_node):
+MAIN_MENU = """
+Main Menu:
+1. Gather report statistics
+2. Print out the report
+3. Generate consolidated JSON file
+4. Generate graph data JSON file for Jupyter notebook
+5. Quit"""
+
+def main_menu(summary, selected_node):
     """Display the main menu and handle user choices."""
     while True:
-        print("\nMain Menu:")
-        print("1. Gather report statistics")
-        print("2. Print out the report")
-        print("3. Generate consolidated JSON file")
-        print("4. Generate graph data JSON file for Jupyter notebook")
-        print("5. Quit")
+        print(MAIN_MENU)
         choice = input("Enter your choice (1/2/3/4/5): ").strip()
 
         if choice == '1':
-            gather_statistics(impact_reports)
+            gather_statistics(summary)
         elif choice == '2':
-            print_report(impact_reports, selected_node)
+            print_report(summary, selected_node)
         elif choice == '3':
-            generate_consolidated_json(impact_reports)
+            generate_consolidated_json(summary.reports_by_node)
         elif choice == '4':
-            generate_graph_data_json(impact_reports)
+            generate_graph_data_json(summary.reports_by_node)
         elif choice == '5':
             print("Exiting.")
             break
         else:
             print("Invalid choice. Please select 1, 2, 3, 4, or 5.")
 
-def main():
-    # Check if session.json exists
-    if not os.path.exists('session.json'):
-        print("session.json not found. Collecting session data...")
-        save_session_data()
-
-    # Load session data
-    session_data = load_session_data()
-    if session_data is None:
-        return
+def main(refresh=False):
+    # Check if session.json exists, is recent enough and may be reused
+    pods_result = None
+    ttl = session_ttl()
+    age = session_age()
+    if not refresh and age is not None and not (ttl and age >= ttl):
+        # Load session data
+        session_data = load_session_data()
+        if session_data is None:
+            return
+    else:
+        if age is None:
+            print("session.json not found. Collecting session data...")
+        elif refresh:
+            print("Ignoring the existing session data. Collecting session data...")
+        else:
+            print(f"session.json is older than {ttl} seconds. Collecting session data...")
+        # Only the node list is needed to prompt the user, so fetch the much
+        # larger pod list in the background while they pick a node
+        pods_result = run_in_background(get_cluster_pods)
+        session_data = {'nodes': get_cluster_nodes()}
 
     node_names = get_node_list(session_data)
     if not node_names:
         print("No nodes found in the session data.")
         return
     selected_node, is_combined = select_node(node_names)
+    # Parse container_info.json while the pod list may still be being fetched
     container_info = load_container_info()
+    if pods_result is not None:
+        session_data = save_session_data(session_data['nodes'], pods_result())
     if container_info is None:
         return
 
@@ -377,24 +515,30 @@ def main():
         print(f"\nSelected Node: {selected_node}\n")
         pods_data = get_pods_on_node(session_data, selected_node)
 
-    containers = extract_containers(pods_data)
-    if not containers:
+    # Containers are assessed as they are extracted, without an intermediate list
+    impact_reports, missing_containers = assess_impact(extract_containers(pods_data), container_info)
+    if not impact_reports:
         print("No containers found.")
         return
 
-    impact_reports, missing_containers = assess_impact(containers, container_info)
-
     if missing_containers:
-        print("\nWarning: Some containers are missing from container_info.json:")
-        for namespace, container_name in missing_containers:
-            print(f"Namespace: {namespace}, Container: {container_name}")
-        print("Consider updating container_info.json with these containers.")
-
+        warning_lines = ["\nWarning: Some containers are missing from container_info.json:"]
+        warning_lines.extend(f"Namespace: {namespace}, Container: {container_name}"
+                             for namespace, container_name in missing_containers)
+        warning_lines.append("Consider updating container_info.json with these containers.")
+        print('\n'.join(warning_lines))
+
+    # Sort, count and group the reports once for all menu actions
+    summary = summarize_reports(impact_reports)
     if is_combined:
         # For combined report, generate tables per node and save the report
-        main_menu(impact_reports, None)
+        main_menu(summary, None)
     else:
-        main_menu(impact_reports, selected_node)
+        main_menu(summary, selected_node)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Assess the impact of a node failure on its containers.")
+    parser.add_argument('--refresh', '--no-cache', action='store_true',
+                        help="ignore session.json and collect a new snapshot from the cluster")
+    args = parser.parse_args()
+    main(refresh=args.refresh)